@@ -6,16 +6,33 @@ App com auto-atualização via Tufup
 from __future__ import annotations
 import sys
 import os
-import shutil
+import json
+import functools
 import time
-import urllib.request
-from dotenv import load_dotenv
+from datetime import datetime, timezone
 from pathlib import Path
-from tufup.client import Client
+
+
+@functools.lru_cache(maxsize=1)
+def _http():
+    """
+    Pool HTTP compartilhado: metadados e targets reutilizam a mesma conexão
+    keep-alive (TLS) por host. Criado só quando há acesso à rede.
+    """
+    import urllib3
+
+    return urllib3.PoolManager(
+        num_pools=4,
+        maxsize=4,
+        retries=urllib3.Retry(3, backoff_factor=0.2),
+        headers={"Accept-Encoding": "gzip"},
+    )
+
 
 # =========================
 # Helpers de caminho/ambiente
 # =========================
+@functools.lru_cache(maxsize=8)
 def get_runtime_paths(app_name):
     """
     Retorna:
@@ -24,10 +41,10 @@ def get_runtime_paths(app_name):
     """
     if getattr(sys, "frozen", False):
         # Executando como .exe (PyInstaller)
-        executable_path = Path(sys.executable).resolve()
+        executable_path = Path(os.path.abspath(sys.executable))
         install_dir = executable_path.parent
     else:
-        executable_path = Path(__file__).resolve()
+        executable_path = Path(os.path.abspath(__file__))
         install_dir = executable_path.parent
 
     # Pastas graváveis do usuário
@@ -46,6 +63,7 @@ def get_runtime_paths(app_name):
     return install_dir, user_base
 
 
+@functools.lru_cache(maxsize=8)
 def ensure_dirs(user_base: Path):
     """
     Cria as pastas necessárias:
@@ -56,8 +74,13 @@ def ensure_dirs(user_base: Path):
     metadata_dir = user_base / "metadata"
     target_dir = user_base / "downloads"
     extract_dir = user_base / "extracted"
+
+    # Um único scandir para saber o que já existe (evita mkdir desnecessários)
+    with os.scandir(user_base) as it:
+        existentes = {entry.name for entry in it if entry.is_dir()}
     for d in (metadata_dir, target_dir, extract_dir):
-        d.mkdir(parents=True, exist_ok=True)
+        if d.name not in existentes:
+            os.makedirs(d, exist_ok=True)
     return metadata_dir, target_dir, extract_dir
 
 
@@ -67,77 +90,274 @@ def copy_bundled_root_if_available(metadata_dir: Path):
     copia para o cache na primeira execução.
     (O exemplo oficial embute root.json no bundle do app.)
     """
+    candidatos = []
     # Tentativa 1: se estiver congelado, procurar no _MEIPASS
-    bundled_root = None
     if getattr(sys, "frozen", False) and hasattr(sys, "_MEIPASS"):
-        maybe = Path(getattr(sys, "_MEIPASS")) / "root.json"
-        if maybe.exists():
-            bundled_root = maybe
-
+        candidatos.append(os.path.join(getattr(sys, "_MEIPASS"), "root.json"))
     # Tentativa 2: procurar ao lado do executável/script
-    if bundled_root is None:
-        here = Path(sys.executable if getattr(sys, "frozen", False) else __file__).resolve().parent
-        maybe = here / "root.json"
-        if maybe.exists():
-            bundled_root = maybe
-
-    if bundled_root:
-        dst = metadata_dir / "root.json"
-        if not dst.exists():
-            shutil.copy2(bundled_root, dst)
-            # Opcional: se você quiser também versionado "1.root.json" na primeira vez:
-            vdst = metadata_dir / "1.root.json"
-            if not vdst.exists():
-                shutil.copy2(bundled_root, vdst)
+    here = os.path.dirname(os.path.abspath(sys.executable if getattr(sys, "frozen", False) else __file__))
+    candidatos.append(os.path.join(here, "root.json"))
+
+    # A própria leitura serve de teste de existência
+    data = None
+    for candidato in candidatos:
+        try:
+            with open(candidato, "rb") as fh:
+                data = fh.read()
+            break
+        except FileNotFoundError:
+            continue
+    if data is None:
+        return False
+
+    dst = os.path.join(metadata_dir, "root.json")
+    try:
+        with open(dst, "xb") as fh:
+            fh.write(data)
+    except FileExistsError:
         return True
-    return False
+
+    # Opcional: também o versionado "1.root.json" na primeira vez (hardlink, sem 2ª escrita)
+    vdst = os.path.join(metadata_dir, "1.root.json")
+    try:
+        os.link(dst, vdst)
+    except FileExistsError:
+        pass
+    except OSError:
+        # Sistema de arquivos sem suporte a hardlink
+        try:
+            with open(vdst, "xb") as fh:
+                fh.write(data)
+        except FileExistsError:
+            pass
+    return True
+
+
+# =========================
+# Fetcher HTTP (pool compartilhado)
+# =========================
+def _inicio_content_range(valor: str | None) -> int | None:
+    """Offset inicial de um 'Content-Range: bytes <ini>-<fim>/<total>' (ou None)."""
+    try:
+        unidade, faixa = valor.split(" ", 1)
+        if unidade.strip().lower() != "bytes":
+            return None
+        return int(faixa.split("-", 1)[0])
+    except (AttributeError, ValueError):
+        return None
+
+
+@functools.lru_cache(maxsize=1)
+def _pooled_fetcher_cls():
+    """
+    Cria a classe do fetcher só quando o cliente TUF é realmente usado
+    (a classe base vem de tuf.ngclient, que é pesado para importar).
+    """
+    from contextlib import contextmanager
+
+    import urllib3
+    from tuf.api import exceptions as tuf_exceptions
+    from tuf.ngclient import FetcherInterface
+
+    class _PooledFetcher(FetcherInterface):
+        """
+        Fetcher do TUF que usa o pool _http(), para que check_for_updates e
+        download_and_apply_update reaproveitem as conexões do bootstrap.
+        """
+
+        def __init__(
+                self,
+                chunk_size: int = 1 << 16,
+                timeout: float = 30.0,
+                partial_dir: str | None = None,
+                target_base_url: str | None = None,
+                ):
+            self.chunk_size = chunk_size
+            self.timeout = timeout
+            # Targets (archives/patches) são baixados em <partial_dir>/<nome>.part
+            # e retomados com Range se o download anterior foi interrompido
+            self.partial_dir = partial_dir
+            self.target_base_url = target_base_url
+            self._progress = lambda **kwargs: None
+
+        def attach_progress_hook(self, hook, bytes_expected: int):
+            """Chamado pelo Tufup antes de cada target quando há progress_hook."""
+            self._progress = functools.partial(hook, bytes_expected=bytes_expected)
+
+        def _fetch(self, url: str):
+            try:
+                resp = _http().request(
+                    "GET", url, preload_content=False, timeout=self.timeout
+                )
+            except urllib3.exceptions.TimeoutError as e:
+                raise tuf_exceptions.SlowRetrievalError from e
+
+            if resp.status != 200:
+                resp.release_conn()
+                raise tuf_exceptions.DownloadHTTPError(
+                    f"HTTP {resp.status} ao baixar {url}", resp.status
+                )
+            return self._chunks(resp)
+
+        def _chunks(self, resp):
+            bytes_downloaded = 0
+            try:
+                for chunk in resp.stream(self.chunk_size):
+                    bytes_downloaded += len(chunk)
+                    self._progress(bytes_downloaded=bytes_downloaded)
+                    yield chunk
+            except urllib3.exceptions.TimeoutError as e:
+                raise tuf_exceptions.SlowRetrievalError from e
+            finally:
+                resp.release_conn()
+
+        @contextmanager
+        def download_file(self, url: str, max_length: int):
+            if not (self.partial_dir and self.target_base_url
+                    and url.startswith(self.target_base_url)):
+                with super().download_file(url, max_length) as fh:
+                    yield fh
+                return
+
+            partial = os.path.join(self.partial_dir, url.rsplit("/", 1)[-1] + ".part")
+            try:
+                with open(partial, "ab+") as fh:
+                    self._download_resumivel(url, fh, max_length)
+                    fh.seek(0)
+                    yield fh
+            except tuf_exceptions.RepositoryError:
+                # Tamanho/hash não confere com targets.json: descarta o parcial
+                os.unlink(partial)
+                raise
+            # Verificado e persistido pelo TUF; o parcial não é mais necessário
+            os.unlink(partial)
+
+        def _download_resumivel(self, url: str, fh, max_length: int):
+            have = os.fstat(fh.fileno()).st_size
+            if have > max_length:
+                fh.truncate(0)
+                have = 0
+            if have == max_length:
+                return
+
+            # identity: o offset do Range precisa bater com os bytes gravados
+            headers = {"Accept-Encoding": "identity"}
+            if have:
+                headers["Range"] = f"bytes={have}-"
+            try:
+                resp = _http().request(
+                    "GET", url, headers=headers, preload_content=False, timeout=self.timeout
+                )
+                try:
+                    if resp.status == 200:
+                        # Servidor ignorou o Range: recomeça do zero
+                        fh.truncate(0)
+                        have = 0
+                    elif resp.status == 206:
+                        if _inicio_content_range(resp.headers.get("Content-Range")) != have:
+                            # Faixa diferente da pedida: descarta o parcial e baixa do zero
+                            fh.truncate(0)
+                            resp.release_conn()
+                            return self._download_resumivel(url, fh, max_length)
+                    else:
+                        if resp.status == 416:
+                            fh.truncate(0)
+                        raise tuf_exceptions.DownloadHTTPError(
+                            f"HTTP {resp.status} ao baixar {url}", resp.status
+                        )
+                    if have:
+                        print(f"  ↻ Retomando download a partir de {have} bytes")
+                    for chunk in resp.stream(self.chunk_size):
+                        have += len(chunk)
+                        if have > max_length:
+                            raise tuf_exceptions.DownloadLengthMismatchError(
+                                f"Mais de {max_length} bytes recebidos de {url}"
+                            )
+                        fh.write(chunk)
+                        self._progress(bytes_downloaded=have)
+                finally:
+                    resp.release_conn()
+            except tuf_exceptions.DownloadError:
+                raise
+            except urllib3.exceptions.TimeoutError as e:
+                raise tuf_exceptions.SlowRetrievalError from e
+            except Exception as e:
+                raise tuf_exceptions.DownloadError(f"Falha ao baixar {url}: {e}") from e
+
+    return _PooledFetcher
 
 
 # =========================
 # Updater
 # =========================
+MUTABLE_METADATA = frozenset(("timestamp.json", "snapshot.json", "targets.json"))
+
+
 class AppUpdater:
     def __init__(
             self, 
             app_name, 
             current_version,
             metadata_target,
-            target_base
+            target_base,
+            ttl_seconds: int = 900,
             ):
         install_dir, user_base = get_runtime_paths(app_name)
         self.install_dir = install_dir
         self.user_base = user_base
+        # Intervalo mínimo entre verificações remotas (segundos)
+        self.ttl_seconds = ttl_seconds
+        self._last_progress_ts = 0.0
 
         self.metadata_dir, self.target_dir, self.extract_dir = ensure_dirs(user_base)
+        self._metadata_dir_str = str(self.metadata_dir)
+
+        self.app_name = app_name
+        self.current_version = current_version
+        self.metadata_target = metadata_target
+        self.target_base = target_base
+        self._client = None
 
         # Inicializa metadados root (bootstrap) se necessário
         self._initialize_metadata(metadata_target)
 
-        # Cria cliente Tufup
-        self.client = Client(
-            app_name=app_name,
-            app_install_dir=self.install_dir,
-            current_version=current_version,
-            metadata_dir=self.metadata_dir,
-            metadata_base_url=metadata_target,
-            target_dir=self.target_dir,
-            target_base_url=target_base,
-            extract_dir=self.extract_dir,
-        )
-        
+    @property
+    def client(self):
+        """
+        Cliente Tufup, criado no primeiro uso: dentro do TTL nenhuma
+        verificação remota acontece e TUF/securesystemslib nem são importados.
+        """
+        if self._client is None:
+            from tufup.client import Client
+
+            self._client = Client(
+                app_name=self.app_name,
+                app_install_dir=self.install_dir,
+                current_version=self.current_version,
+                metadata_dir=self.metadata_dir,
+                metadata_base_url=self.metadata_target,
+                target_dir=self.target_dir,
+                target_base_url=self.target_base,
+                extract_dir=self.extract_dir,
+            )
+            # Troca o fetcher padrão pelo que usa o pool compartilhado
+            self._client._fetcher = _pooled_fetcher_cls()(
+                partial_dir=str(self.target_dir),
+                target_base_url=self.target_base,
+            )
+        return self._client
 
     def _initialize_metadata(self, metadata_target):
         """
         Bootstrap do TUF:
           1) Tenta usar root.json embutido no app (preferível).
           2) Se não houver, baixa 1.root.json e root.json do repositório (RAW) apenas 1ª vez.
-        Sempre limpa metadados MUTÁVEIS antes de verificar update.
+        Limpa metadados MUTÁVEIS antes de verificar update, exceto se o cache
+        ainda estiver dentro do TTL.
         """
-        print("  🧹 Limpando cache de metadados mutáveis...")
-        for fname in ("timestamp.json", "snapshot.json", "targets.json"):
-            f = self.metadata_dir / fname
-            if f.exists():
-                f.unlink()
+        if not self._cache_valido():
+            print("  🧹 Limpando cache de metadados mutáveis...")
+            self._purge_mutable()
 
         root_file = self.metadata_dir / "root.json"
         versioned_root = self.metadata_dir / "1.root.json"
@@ -156,30 +376,105 @@ class AppUpdater:
 
         # Fallback: baixa 1.root.json e root.json do GitHub RAW (bootstrap TOFU)
         print("🔧 Inicializando metadados TUF (bootstrap remoto)...")
-        for fname in ("1.root.json", "root.json"):
-            self._download_metadata_file(fname, metadata_target)
+        from concurrent.futures import ThreadPoolExecutor
+
+        # Arquivos independentes: baixa em paralelo (o pool HTTP é thread-safe)
+        with ThreadPoolExecutor(max_workers=4) as ex:
+            list(ex.map(
+                lambda fname: self._download_metadata_file(fname, metadata_target),
+                ("1.root.json", "root.json"),
+            ))
         print("  ✓ Metadados root inicializados")
 
     def _download_metadata_file(self, filename: str, metadata_target: str):
+        import shutil
+        import tempfile
+
         url = f"{metadata_target}{filename}"
+        dest = os.path.join(self._metadata_dir_str, filename)
         print(f"  📥 Baixando: {filename}\n     URL: {url}")
-        content = urllib.request.urlopen(url).read()
-        (self.metadata_dir / filename).write_bytes(content)
-        print(f"  ✓ Salvo: {(self.metadata_dir / filename)}")
+        headers = {"Accept-Encoding": "gzip,deflate"}
+
+        # Escrita atômica: falha no meio do download não deixa arquivo parcial
+        fd, tmp = tempfile.mkstemp(dir=self._metadata_dir_str, prefix=f".{filename}.")
+        try:
+            resp = _http().request("GET", url, headers=headers, preload_content=False)
+            try:
+                if resp.status != 200:
+                    raise RuntimeError(f"HTTP {resp.status} ao baixar {url}")
+                # Streaming em blocos de 1 MiB (não carrega o corpo inteiro na memória)
+                with os.fdopen(fd, "wb") as fh:
+                    fd = None
+                    shutil.copyfileobj(resp, fh, 1 << 20)
+            finally:
+                resp.release_conn()
+            os.replace(tmp, dest)
+        except BaseException:
+            if fd is not None:
+                os.close(fd)
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        print(f"  ✓ Salvo: {dest}")
+
+    def _purge_mutable(self):
+        """Remove timestamp/snapshot/targets.json numa única passada de scandir."""
+        with os.scandir(self._metadata_dir_str) as it:
+            for entry in it:
+                if entry.name in MUTABLE_METADATA:
+                    try:
+                        os.unlink(entry.path)
+                    except FileNotFoundError:
+                        pass
+
+    def _cache_valido(self, skew: int = 60) -> bool:
+        """
+        True se a última verificação foi há menos de ttl_seconds e o
+        timestamp.json em cache ainda não expirou (com margem de skew).
+        """
+        now = time.time()
+        try:
+            with open(os.path.join(self._metadata_dir_str, "state.json")) as fh:
+                state = json.load(fh)
+            with open(os.path.join(self._metadata_dir_str, "timestamp.json")) as fh:
+                timestamp = json.load(fh)
+            last_check_ts = float(state["last_check_ts"])
+            expires = datetime.strptime(
+                timestamp["signed"]["expires"], "%Y-%m-%dT%H:%M:%SZ"
+            ).replace(tzinfo=timezone.utc).timestamp()
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        return now - last_check_ts < self.ttl_seconds and expires > now + skew
+
+    def _registrar_verificacao(self):
+        """Grava o horário da última verificação remota em state.json."""
+        state = {"last_check_ts": time.time()}
+        with open(os.path.join(self._metadata_dir_str, "state.json"), "w") as fh:
+            json.dump(state, fh)
 
     def _progress(self, *, bytes_downloaded: int, bytes_expected: int):
+        # No máximo ~20 atualizações/s; a última (100%) sempre é exibida
+        now = time.monotonic()
+        if now - self._last_progress_ts < 0.05 and bytes_downloaded != bytes_expected:
+            return
+        self._last_progress_ts = now
         pct = (bytes_downloaded / max(bytes_expected, 1)) * 100.0
-        print(f"    ⇣ {bytes_downloaded}/{bytes_expected} bytes ({pct:.1f}%)", end="\r")
+        sys.stdout.write(f"    ⇣ {bytes_downloaded}/{bytes_expected} bytes ({pct:.1f}%)\r")
+        sys.stdout.flush()
 
     def check_for_updates(self, app_name, current_version):
         """Verifica se há atualizações disponíveis."""
         print(f"Verificando atualizações para {app_name} v{current_version}...")
         try:
+            if self._cache_valido():
+                self._latest_meta = None
+                print("✓ Verificação recente dentro do TTL, nenhuma atualização pendente.")
+                return None
+
             # Limpa novamente os mutáveis (garante estado limpo)
-            for fname in ("timestamp.json", "snapshot.json", "targets.json"):
-                f = self.metadata_dir / fname
-                if f.exists():
-                    f.unlink()
+            self._purge_mutable()
 
             print("  Buscando atualizações...")
             # check_for_updates chama refresh() conforme necessário
@@ -192,6 +487,8 @@ class AppUpdater:
                 return latest_meta
             else:
                 self._latest_meta = None
+                # Só registra quando não há update pendente, para não pulá-lo no próximo início
+                self._registrar_verificacao()
                 print("✓ Você está na versão mais recente!")
                 return None
 
@@ -210,7 +507,8 @@ class AppUpdater:
             self.client.download_and_apply_update(
                 skip_confirmation=True,
                 purge_old_archives=True,
-                install=custom_install
+                install=custom_install,
+                progress_hook=self._progress,
             )
 
             print("\n✓ Atualização aplicada com sucesso!")
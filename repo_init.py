@@ -8,15 +8,25 @@ e grava url_path_segments para uso com GitHub Releases.
 from pathlib import Path
 from tufup.repo import Repository
 from dotenv import load_dotenv
+import argparse
+import functools
 import shutil
 import sys
 import os
+import threading
+import uuid
 
 # Configurações
 REPO_DIR = Path("tufup-repo")
 KEYS_DIR = Path("keystore")
 APP_NAME: str | None = None
 
+@functools.lru_cache(maxsize=1)
+def _repo():
+    """Repository carregado do config uma única vez por execução."""
+    return Repository.from_config()
+
+
 def criar_repositorio():
     """Cria o repositório Tufup inicial (gera/usa chaves e metadados)."""
     from securesystemslib.keys import generate_ed25519_key
@@ -75,6 +85,53 @@ def criar_repositorio():
     return repo
 
 
+def _async_rmtree(path):
+    """
+    Renomeia a pasta para um irmão .trash-<id> (uma única syscall) e apaga
+    em segundo plano. A thread não é daemon: o interpretador espera a
+    remoção terminar ao sair, mas as mensagens ao usuário saem na hora.
+    """
+    path = Path(path)
+    lixo = path.with_name(f"{path.name}.trash-{uuid.uuid4().hex[:8]}")
+    try:
+        os.rename(path, lixo)
+    except FileNotFoundError:
+        return None
+    except OSError:
+        # Ex.: arquivo em uso no Windows; remove de forma síncrona
+        shutil.rmtree(path, ignore_errors=True)
+        return None
+    t = threading.Thread(
+        target=shutil.rmtree, args=(lixo,), kwargs={"ignore_errors": True}
+    )
+    t.start()
+    return t
+
+
+def _hardlink_tree(src, dst):
+    """
+    Replica a árvore src em dst com hardlinks (nenhum byte é copiado).
+    Cai para shutil.copy2 quando o link não é possível (ex.: outro volume).
+    """
+    for root, dirs, files in os.walk(src):
+        rel = os.path.relpath(root, src)
+        dst_root = os.path.join(dst, rel)
+        os.makedirs(dst_root, exist_ok=True)
+        # os.walk não entra em diretórios que são symlinks: copia o conteúdo
+        # deles como o copytree fazia
+        for d in dirs:
+            origem = os.path.join(root, d)
+            if os.path.islink(origem):
+                shutil.copytree(origem, os.path.join(dst_root, d))
+        for f in files:
+            origem = os.path.join(root, f)
+            destino = os.path.join(dst_root, f)
+            try:
+                os.link(origem, destino)
+            except OSError:
+                shutil.copy2(origem, destino)
+
+
 def empacotar_app(versao, dist_dir="dist"):
     """
     Monta um diretório de bundle (sem criar .tar.gz).
@@ -99,8 +156,7 @@ def empacotar_app(versao, dist_dir="dist"):
 
     bundle_dir = Path(f"temp_bundle_{versao}")
     try:
-        if bundle_dir.exists():
-            shutil.rmtree(bundle_dir)
+        _async_rmtree(bundle_dir)
         bundle_dir.mkdir()
 
         # Opção 1: --onefile (um único .exe)
@@ -112,7 +168,7 @@ def empacotar_app(versao, dist_dir="dist"):
         # Opção 2: --onedir (pasta com vários arquivos)
         app_folder = dist_path / APP_NAME
         if app_folder.exists() and app_folder.is_dir():
-            shutil.copytree(app_folder, bundle_dir / APP_NAME)
+            _hardlink_tree(app_folder, bundle_dir / APP_NAME)
             print(f"  ✓ Pasta {APP_NAME}/ completa")
 
         # Copiar arquivos adicionais necessários (opcionais)
@@ -128,7 +184,7 @@ def empacotar_app(versao, dist_dir="dist"):
                 if p.is_file():
                     shutil.copy2(p, bundle_dir / p.name)
                 elif p.is_dir():
-                    shutil.copytree(p, bundle_dir / p.name)
+                    _hardlink_tree(p, bundle_dir / p.name)
                 print(f"  ✓ {extra}")
 
         # Verificar conteúdo
@@ -141,8 +197,7 @@ def empacotar_app(versao, dist_dir="dist"):
 
     except Exception as e:
         print(f"✗ Erro ao montar bundle: {e}")
-        if bundle_dir.exists():
-            shutil.rmtree(bundle_dir)
+        _async_rmtree(bundle_dir)
         return None
     
 
@@ -194,7 +249,7 @@ def adicionar_primeira_versao(versao, bundle_dir, tag_release=None):
         return False
 
     try:
-        repo = Repository.from_config()
+        repo = _repo()
 
         # Deixa o Tufup gerar o .tar.gz e atualizar metadados (sem patch)
         repo.add_bundle(
@@ -210,7 +265,7 @@ def adicionar_primeira_versao(versao, bundle_dir, tag_release=None):
         repo.publish_changes(private_key_dirs=[KEYS_DIR])
 
         # Limpa bundle temporário
-        shutil.rmtree(bundle_path, ignore_errors=True)
+        _async_rmtree(bundle_path)
 
         tar_path = repo.targets_dir / f"{APP_NAME}-{versao}.tar.gz"
         size = os.path.getsize(tar_path) if tar_path.exists() else 0
@@ -237,7 +292,7 @@ def adicionar_versao(versao, bundle_dir, tag_release=None):
         return False
 
     try:
-        repo = Repository.from_config()
+        repo = _repo()
 
         # Se não existir nenhuma versão anterior, adicionar como primeira
         if not repo.targets_dir.exists() or not any(repo.targets_dir.glob(f"{APP_NAME}-*.tar.gz")):
@@ -257,7 +312,7 @@ def adicionar_versao(versao, bundle_dir, tag_release=None):
         repo.publish_changes(private_key_dirs=[KEYS_DIR])
 
         # Limpa bundle temporário
-        shutil.rmtree(bundle_path, ignore_errors=True)
+        _async_rmtree(bundle_path)
 
         tar_path = repo.targets_dir / f"{APP_NAME}-{versao}.tar.gz"
         size = os.path.getsize(tar_path) if tar_path.exists() else 0
@@ -328,6 +383,30 @@ def require_app_name():
 
 
 
+def _parse_args(argv):
+    """
+    Normaliza o argv uma única vez:
+      init|compile <APP_NAME>
+      <comando> <versão> <APP_NAME>
+    """
+    comando = argv[0].lower()
+
+    # comandos que NÃO precisam de versão
+    if comando in {"init", "compile"}:
+        if len(argv) < 2:
+            print("✗ É necessário informar o APP_NAME.")
+            print(f"Ex.: update_manager {comando} test")
+            sys.exit(1)
+        return argparse.Namespace(comando=comando, versao=None, app_name=argv[1])
+
+    # comandos que precisam de versão
+    if len(argv) < 3:
+        print("✗ É necessário informar versão e APP_NAME.")
+        print(f"Ex.: update_manager {comando} 2.0.0 test")
+        sys.exit(1)
+    return argparse.Namespace(comando=comando, versao=argv[1], app_name=argv[2])
+
+
 def main():
     global APP_NAME
     
@@ -348,27 +427,9 @@ def main():
         print("="*60)
         sys.exit(1)
 
-    comando = sys.argv[1].lower()
-
-    
-    # comandos que NÃO precisam de versão
-    if comando in {"init", "compile"}:
-        if len(sys.argv) < 3:
-            print("✗ É necessário informar o APP_NAME.")
-            print(f"Ex.: update_manager {comando} test")
-            sys.exit(1)
-
-        APP_NAME = sys.argv[2]
-
-    else:
-        # comandos que precisam de versão
-        if len(sys.argv) < 4:
-            print("✗ É necessário informar versão e APP_NAME.")
-            print(f"Ex.: update_manager {comando} 2.0.0 test")
-            sys.exit(1)
-
-        APP_NAME = sys.argv[3]
-
+    args = _parse_args(sys.argv[1:])
+    comando = args.comando
+    APP_NAME = args.app_name
 
     if comando == "init":
         criar_repositorio()
@@ -377,20 +438,13 @@ def main():
         compilar_exe()
 
     elif comando == "pack":
-        if len(sys.argv) < 3:
-            print("✗ Especifique a versão: python criar_repositorio.py pack 1.0.5")
-            sys.exit(1)
-        versao = sys.argv[2]
+        versao = args.versao
         bundle_dir = empacotar_app(versao)
         if bundle_dir:
             print(f"\n✓ Bundle pronto: {bundle_dir}")
 
     elif comando == "add":
-        if len(sys.argv) < 3:
-            print("✗ Especifique a versão: python criar_repositorio.py add 1.0.5")
-            sys.exit(1)
-
-        versao = sys.argv[2]
+        versao = args.versao
         tag = f"v{versao}"  # ajuste se usar outro padrão de tag
         bundle_dir = empacotar_app(versao)
         if not bundle_dir:
@@ -400,11 +454,7 @@ def main():
             mostrar_instrucoes(versao)
 
     elif comando == "full":
-        if len(sys.argv) < 3:
-            print("✗ Especifique a versão: python criar_repositorio.py full 1.0.5")
-            sys.exit(1)
-
-        versao = sys.argv[2]
+        versao = args.versao
         tag = f"v{versao}"
 
         # 1. Montar bundle
@@ -2,50 +2,226 @@
 import sys
 import os
 import shutil
+import stat
 import time
 import signal
 import platform
+import threading
+import uuid
 from pathlib import Path
 
 
+PROCESS_TERMINATE = 0x0001
+SYNCHRONIZE = 0x00100000
+WAIT_OBJECT_0 = 0x0
+
+
+def _terminate_process_windows(pid: int):
+    """Encerra o processo direto pelo kernel32 (sem abrir cmd/taskkill)."""
+    import ctypes
+
+    kernel32 = ctypes.windll.kernel32
+    handle = kernel32.OpenProcess(PROCESS_TERMINATE, False, pid)
+    if not handle:
+        return
+    try:
+        kernel32.TerminateProcess(handle, 1)
+    finally:
+        kernel32.CloseHandle(handle)
+
+
 def kill_process(pid: int):
     try:
         if platform.system() == "Windows":
-            os.system(f"taskkill /PID {pid} /F >nul 2>&1")
+            _terminate_process_windows(pid)
         else:
             os.kill(pid, signal.SIGTERM)
     except Exception:
         pass
 
 
+def _wait_process_windows(pid: int, timeout: float) -> bool:
+    """
+    Espera no kernel (WaitForSingleObject) até o processo terminar.
+    Retorna True se o processo terminou (ou não existe mais).
+    """
+    import ctypes
+
+    kernel32 = ctypes.windll.kernel32
+    handle = kernel32.OpenProcess(SYNCHRONIZE, False, pid)
+    if not handle:
+        # Processo já não existe
+        return True
+    try:
+        return kernel32.WaitForSingleObject(handle, int(timeout * 1000)) == WAIT_OBJECT_0
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def _poll_delays(timeout: float, first=0.005, cap=0.5):
+    """Intervalos geométricos (5 ms → 500 ms) cuja soma não passa do timeout."""
+    delay = first
+    remaining = timeout
+    while remaining > 0:
+        step = min(delay, remaining)
+        yield step
+        remaining -= step
+        delay = min(delay * 2, cap)
+
+
 def wait_process_end(pid: int, timeout=10):
-    start = time.time()
-    while time.time() - start < timeout:
+    if platform.system() == "Windows":
+        if _wait_process_windows(pid, timeout):
+            return
+        kill_process(pid)
+        return
+
+    # POSIX: polling adaptativo, mais frequente no início (quando a saída é mais provável)
+    for delay in _poll_delays(timeout):
         try:
             os.kill(pid, 0)
-            time.sleep(0.5)
         except OSError:
             return
+        time.sleep(delay)
     kill_process(pid)
 
 
+def _copiar_arquivo(src, dst):
+    """
+    Copia só conteúdo, mtime e permissões (sem o chown/flags extra do copy2),
+    deixando a cópia dos bytes no kernel sempre que possível:
+      Windows: CopyFileW (já preserva as datas)
+      Linux  : os.sendfile
+      outros : shutil.copyfile (fcopyfile no macOS)
+    """
+    if platform.system() == "Windows":
+        import ctypes
+
+        if not ctypes.windll.kernel32.CopyFileW(str(src), str(dst), False):
+            raise ctypes.WinError()
+        return dst
+
+    if sys.platform.startswith("linux"):
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            in_fd, out_fd = fsrc.fileno(), fdst.fileno()
+            size = os.fstat(in_fd).st_size
+            offset = 0
+            while offset < size:
+                sent = os.sendfile(out_fd, in_fd, offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+    else:
+        shutil.copyfile(src, dst)
+
+    st = os.stat(src)
+    os.chmod(dst, stat.S_IMODE(st.st_mode))
+    os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+    return dst
+
+
+def _arquivo_inalterado(src, dst) -> bool:
+    """
+    True se dst já tem exatamente o conteúdo de src. Tamanho diferente
+    decide sem ler nada; com tamanho igual, compara os bytes (mtime não
+    basta: dois arquivos gravados no mesmo segundo podem diferir).
+    """
+    try:
+        s_src = os.stat(src)
+        s_dst = os.stat(dst)
+    except FileNotFoundError:
+        return False
+    if not stat.S_ISREG(s_dst.st_mode) or s_src.st_size != s_dst.st_size:
+        return False
+    with open(src, "rb") as fa, open(dst, "rb") as fb:
+        while True:
+            a = fa.read(1 << 20)
+            if a != fb.read(1 << 20):
+                return False
+            if not a:
+                return True
+
+
+def _remover(path):
+    try:
+        dest_is_dir = stat.S_ISDIR(os.lstat(path).st_mode)
+    except FileNotFoundError:
+        return
+    if dest_is_dir:
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        os.unlink(path)
+
+
+def _sincronizar_arvore(src, dst):
+    """
+    Deixa dst igual a src copiando só os arquivos que mudaram
+    e removendo o que não existe mais em src.
+    """
+    if not os.path.isdir(dst):
+        _remover(dst)
+        os.makedirs(dst)
+
+    with os.scandir(src) as it:
+        itens = {entry.name: entry for entry in it}
+    with os.scandir(dst) as it:
+        obsoletos = [entry.path for entry in it if entry.name not in itens]
+    for path in obsoletos:
+        _remover(path)
+
+    for nome, entry in itens.items():
+        dest_item = os.path.join(dst, nome)
+        if entry.is_dir():
+            _sincronizar_arvore(entry.path, dest_item)
+        elif not _arquivo_inalterado(entry.path, dest_item):
+            _remover(dest_item)
+            _copiar_arquivo(entry.path, dest_item)
+
+
+def _async_rmtree(path):
+    # Mesma lógica de repo_init._async_rmtree (o updater.exe é congelado sozinho)
+    path = Path(path)
+    lixo = path.with_name(f"{path.name}.trash-{uuid.uuid4().hex[:8]}")
+    try:
+        os.rename(path, lixo)
+    except FileNotFoundError:
+        return None
+    except OSError:
+        # Ex.: arquivo em uso no Windows; remove de forma síncrona
+        shutil.rmtree(path, ignore_errors=True)
+        return None
+    t = threading.Thread(
+        target=shutil.rmtree, args=(lixo,), kwargs={"ignore_errors": True}
+    )
+    t.start()
+    return t
+
+
 def copy_update(extract_dir: Path, destino: Path):
     """
-    Copia os arquivos EXTRAÍDOS para o diretório de instalação
+    Move (mesmo volume) ou copia os arquivos EXTRAÍDOS para o diretório de instalação.
+    Na cópia entre volumes, arquivos já idênticos no destino são mantidos.
     """
-    for item in extract_dir.iterdir():
-        dest_item = destino / item.name
+    extract_str = os.fspath(extract_dir)
+    destino_str = os.fspath(destino)
+    mesmo_volume = os.stat(extract_str).st_dev == os.stat(destino_str).st_dev
+
+    with os.scandir(extract_str) as it:
+        itens = list(it)
 
-        if dest_item.exists():
-            if dest_item.is_file():
-                dest_item.unlink()
-            else:
-                shutil.rmtree(dest_item, ignore_errors=True)
+    for item in itens:
+        dest_item = os.path.join(destino_str, item.name)
 
-        if item.is_file():
-            shutil.copy2(item, dest_item)
+        if mesmo_volume:
+            # Só atualiza a entrada de diretório, sem copiar bytes
+            _remover(dest_item)
+            os.replace(item.path, dest_item)
+        elif item.is_file():
+            if not _arquivo_inalterado(item.path, dest_item):
+                _remover(dest_item)
+                _copiar_arquivo(item.path, dest_item)
         else:
-            shutil.copytree(item, dest_item)
+            _sincronizar_arvore(item.path, dest_item)
 
 
 def main():
@@ -54,8 +230,8 @@ def main():
         sys.exit(1)
 
     pid = int(sys.argv[1])
-    destino = Path(sys.argv[2]).resolve()
-    extract_dir = Path(sys.argv[3]).resolve()
+    destino = Path(os.path.abspath(sys.argv[2]))
+    extract_dir = Path(os.path.abspath(sys.argv[3]))
 
     print("🔄 Iniciando atualização...")
     time.sleep(2)
@@ -77,7 +253,7 @@ def main():
         sys.exit(1)
 
     # 4️⃣ Limpa pasta temporária
-    shutil.rmtree(extract_dir, ignore_errors=True)
+    _async_rmtree(extract_dir)
 
     print("✅ Atualização concluída com sucesso.")
     sys.exit(0)